@@ -52,33 +52,102 @@ code if an error occurs.
 # © Marius N 2026
 
 import argparse
+import atexit
+import base64
+import contextlib
+import io
 import json
 import datetime
+import functools
+import gzip
+import hashlib
+import math
+import mimetypes
+import mmap
+import multiprocessing
 import os
-import random
+import queue
+import re
+import select
 import subprocess
 import shutil
 import sys
-import time
+import tempfile
+import threading
+import urllib.parse
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 _WEASY_AVAILABLE = False  # Lazy-import WeasyPrint in _export_pdf to avoid noisy import warnings
 
 try:
-    # Import TkinterDnD2 for drag-and-drop support.  The import structure is
-    # slightly unusual: the TkinterDnD module exposes a class named `Tk` that
-    # is used in place of `tk.Tk()`【548805974107881†L96-L116】.
-    from tkinterdnd2 import TkinterDnD, DND_FILES  # type: ignore
+    # orjson parses large xcresulttool output several times faster than the
+    # stdlib and accepts bytes directly; fall back to json when missing.
+    import orjson as _json  # type: ignore
 
-    _DND_AVAILABLE = True
+    _ORJSON_AVAILABLE = True
 except Exception:
-    _DND_AVAILABLE = False
+    _json = json
+    _ORJSON_AVAILABLE = False
+
+
+def _json_dumps(obj) -> bytes:
+    """Compact UTF-8 JSON; orjson returns bytes directly, the stdlib path encodes."""
+    if _ORJSON_AVAILABLE:
+        return _json.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+try:
+    # ijson lets oversized summaries be scanned as a stream instead of being
+    # materialised as one big dict.
+    import ijson  # type: ignore
+
+    _IJSON_AVAILABLE = True
+except Exception:
+    _IJSON_AVAILABLE = False
+
+# Above this size, xcresulttool output is scanned with ijson (when installed).
+_STREAMING_JSON_THRESHOLD = 8 * 1024 * 1024
+# Top-level summary keys picked up by the streaming scan.
+_SUMMARY_COUNT_KEYS = ("passedTests", "failedTests", "skippedTests", "totalTestCount")
+# Upper bound for each read from the xcresulttool pipes. Reads return whatever
+# the pipe holds, so a large bound drains a backed-up pipe in one call.
+_PIPE_READ_CHUNK = 1024 * 1024
+# xcresulttool output above this is refused rather than parsed.
+MAX_JSON_BYTES = 256 * 1024 * 1024
+# xcresulttool version shipped with Xcode 16, where plain `get --format json` was removed.
+_XCRESULTTOOL_LEGACY_ONLY_VERSION = 23000
+
+# GUI modules are imported by _import_gui() only when the GUI is launched, so
+# --cli runs never load Tcl/Tk (and work on headless CI machines without it).
+tk = filedialog = messagebox = ttk = None
+TkinterDnD = DND_FILES = None
+_DND_AVAILABLE = False
+
+
+def _import_gui() -> None:
+    """Import tkinter (and tkinterdnd2 when installed) into module globals."""
+    global tk, filedialog, messagebox, ttk, TkinterDnD, DND_FILES, _DND_AVAILABLE
+    if tk is not None:
+        return
+    try:
+        # Import TkinterDnD2 for drag-and-drop support.  The import structure is
+        # slightly unusual: the TkinterDnD module exposes a class named `Tk` that
+        # is used in place of `tk.Tk()`【548805974107881†L96-L116】.
+        from tkinterdnd2 import TkinterDnD, DND_FILES  # type: ignore
+
+        _DND_AVAILABLE = True
+    except Exception:
+        _DND_AVAILABLE = False
+
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, ttk
 
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
 
 # --- Simple file logging (for debugging) ---
+@functools.lru_cache(maxsize=1)
 def _script_dir() -> Path:
     """Directory for default output and logs. When run as a frozen app (.app), use the folder containing the app (one level above the .app)."""
     if getattr(sys, "frozen", False):
@@ -90,6 +159,7 @@ def _script_dir() -> Path:
         return Path.cwd()
 
 
+@functools.lru_cache(maxsize=1)
 def _default_output_dir() -> Path:
     """Script's path / output; created if missing."""
     out = _script_dir() / "output"
@@ -97,30 +167,51 @@ def _default_output_dir() -> Path:
     return out
 
 
+@functools.lru_cache(maxsize=1)
 def _default_output_path() -> str:
     """Default HTML report path: script_dir/output/report.html."""
     return str(_default_output_dir() / "report.html")
 
 
-def _next_available_report_path(path: str) -> str:
-    """If path exists, return next available path: report_1.html, report_2.html, ..."""
+def _next_available_report_path(path: str, reserved=()) -> str:
+    """If path exists (or is in reserved), return next available path: report_1.html, report_2.html, ...
+
+    Taken numbers are collected from one directory listing instead of
+    probing each candidate with its own stat() call.
+    """
     p = Path(path)
-    if not p.exists():
+    if path not in reserved and not p.exists():
         return path
     parent = p.parent
     stem = p.stem
     suffix = p.suffix or ".html"
+    prefix = f"{stem}_"
+    names = [Path(r).name for r in reserved if Path(r).parent == parent]
+    try:
+        with os.scandir(parent) as entries:
+            names.extend(entry.name for entry in entries)
+    except OSError:
+        pass
+    taken = set()
+    for name in names:
+        if name.startswith(prefix) and name.endswith(suffix):
+            number = name[len(prefix):len(name) - len(suffix)]
+            if number.isdecimal():
+                taken.add(int(number))
     n = 1
-    while (parent / f"{stem}_{n}{suffix}").exists():
+    while n in taken:
         n += 1
     return str(parent / f"{stem}_{n}{suffix}")
 
 
+@functools.lru_cache(maxsize=1)
 def _default_log_path() -> str:
+    """Timestamped log next to the script; fixed for the life of the process."""
     ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
     return str(_script_dir() / f"xcresult_gui_{ts}.log")
 
 
+@functools.lru_cache(maxsize=1)
 def _default_xcresult_path() -> Optional[str]:
     """Path to a bundled or nearby 'xcresults' file for pre-fill, or None."""
     if getattr(sys, "frozen", False):
@@ -143,15 +234,34 @@ def _default_xcresult_path() -> Optional[str]:
             return str(same_dir)
     return None
 
+# Open log files by path. Line-buffered, so each line is on disk even if the process is killed.
+_LOG_FILES: Dict[str, "io.TextIOWrapper"] = {}
+# The attachment export and the GUI worker log from background threads.
+_LOG_LOCK = threading.Lock()
+
+
 def _log(log_path: str, msg: str) -> None:
     try:
-        Path(log_path).parent.mkdir(parents=True, exist_ok=True)
-        with open(log_path, "a", encoding="utf-8") as f:
+        with _LOG_LOCK:
+            f = _LOG_FILES.get(log_path)
+            if f is None:
+                Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+                f = _LOG_FILES[log_path] = open(log_path, "a", buffering=1, encoding="utf-8")
             f.write(msg.rstrip() + "\n")
     except Exception:
         pass
 
 
+@atexit.register
+def _close_logs() -> None:
+    while _LOG_FILES:
+        _, f = _LOG_FILES.popitem()
+        try:
+            f.close()
+        except Exception:
+            pass
+
+
 def _process_xcresult_to_html(
     xcresult_path: str,
     out_html_path: str,
@@ -159,90 +269,244 @@ def _process_xcresult_to_html(
     report_title: Optional[str] = None,
     include_details: bool = False,
     include_screenshots: bool = False,
+    debug_json: bool = False,
+    pdf_html_path: Optional[str] = None,
+    embed_images: bool = False,
+    write_gzip: bool = False,
+    progress: Optional[Callable[[str], None]] = None,
+    run: Optional["_CancellableRun"] = None,
 ) -> Tuple[int, int, int]:
-    """Shared helper to run xcresulttool, extract counts, and write HTML+JSON.
+    """Shared helper to run xcresulttool, extract counts, and write HTML.
+
+    With debug_json, the raw xcresulttool JSON is kept next to the HTML
+    (same basename, .json extension); otherwise it is deleted once parsed.
+    With pdf_html_path, a print-only variant of the report (no interactive
+    controls) is also written there as the input for WeasyPrint.
+    With embed_images, screenshots become data: URIs and the test list is
+    inlined, so the HTML is self-contained (the exported screenshot folder
+    is removed afterwards).
+    With write_gzip, gzip copies (.gz) of the HTML and its data script are
+    written alongside for static servers that serve pre-compressed files.
+    progress, if given, is called with a short status line as each stage
+    starts (possibly from a worker thread).
+    run, if given, lets another thread cancel the job: run.cancel() kills its
+    xcresulttool processes and the call raises instead of writing a report.
 
     Returns a tuple of (passed, failed, skipped). Raises on unrecoverable
     I/O or JSON parsing errors.
     """
     _log(log_path, f"[process] xcresult={xcresult_path}")
+    # Single stat: reject a missing bundle before spawning xcresulttool.
+    try:
+        os.stat(xcresult_path)
+    except OSError as exc:
+        _log(log_path, f"[process] ERROR: cannot access xcresult: {exc}")
+        raise RuntimeError(f"Cannot access xcresult bundle: {xcresult_path}\n\n{exc}") from exc
     # Simple path: always use summary so counts and pie chart work.
-    json_str, err_text, cmd_text = run_xcresulttool(xcresult_path)
-    _log(log_path, f"[xcresulttool] cmd={cmd_text}")
-    if err_text.strip():
-        _log(log_path, "[xcresulttool] stderr:\n" + err_text.strip())
-    _log(log_path, f"[xcresulttool] stdout_len={len(json_str) if json_str else 0}")
-
-    debug_json_path = str(Path(out_html_path).with_suffix(".json"))
-    if json_str:
-        try:
-            Path(debug_json_path).write_text(json_str, encoding="utf-8")
-        except Exception:
-            # Do not fail the whole run if we cannot write the debug JSON.
-            pass
-
-    if not json_str:
-        details = ""
-        if cmd_text:
-            details += f"Command: {cmd_text}\n\n"
-        if err_text.strip():
-            details += f"Error output:\n{err_text.strip()}\n"
-        else:
-            details += "No error output captured."
-        raise RuntimeError("Failed to extract summary from xcresult.\n\n" + details)
-
+    out_html = Path(out_html_path)
+    out_html.parent.mkdir(parents=True, exist_ok=True)
+    debug_json_path = str(out_html.with_suffix(".json"))
+    # The attachment export does not depend on the summary, so it runs while
+    # xcresulttool produces the summary; it is killed and its output dropped
+    # if no failed tests turn up.
+    attachments = None
+    if include_details and include_screenshots:
+        export_run = run.child() if run is not None else _CancellableRun()
+        pool = ThreadPoolExecutor(max_workers=1)
+        attachments = pool.submit(_export_attachments, xcresult_path, out_html, log_path, export_run)
+        pool.shutdown(wait=False)
     try:
-        data = json.loads(json_str)
-        _log(log_path, f"[json] Successfully parsed JSON, top-level keys: {list(data.keys())[:10] if isinstance(data, dict) else 'not a dict'}")
-    except Exception as exc:
-        _log(log_path, f"[json] ERROR parsing JSON: {exc}")
-        _log(log_path, f"[json] JSON string length: {len(json_str) if json_str else 0}")
-        _log(log_path, f"[json] JSON string preview (first 500 chars): {json_str[:500] if json_str else 'None'}")
-        raise RuntimeError(f"Failed to parse JSON summary: {exc}") from exc
-
-    passed, failed, skipped = extract_counts(data)
-    _log(log_path, f"[counts] passed={passed} failed={failed} skipped={skipped}")
-    if passed == 0 and failed == 0 and skipped == 0:
-        _log(log_path, "[counts] WARNING: All counts are zero. JSON structure may not match expected patterns.")
-
-    # Detailed path: only from same summary JSON (e.g. testFailures). Does not affect counts.
-    details = None
+        if progress:
+            progress("Extracting summary…")
+        data = _load_summary(xcresult_path, out_html, log_path, debug_json_path if debug_json else None, run)
+
+        passed, failed, skipped = extract_counts(data)
+        _log(log_path, f"[counts] passed={passed} failed={failed} skipped={skipped}")
+        if passed == 0 and failed == 0 and skipped == 0:
+            _log(log_path, "[counts] WARNING: All counts are zero. JSON structure may not match expected patterns.")
+
+        # Detailed path: only from same summary JSON (e.g. testFailures). Does not affect counts.
+        details = None
+        if include_details:
+            details = _extract_details_from_summary(data, log_path)
+    except BaseException:
+        if attachments is not None:
+            _discard_attachments(attachments, export_run, out_html)
+        raise
+
     screenshot_dir_relative = None
     screenshot_map = None
-    if include_details:
-        details = _extract_details_from_summary(data, log_path)
-        if details and include_screenshots:
-            screenshot_dir_relative, screenshot_map = _export_attachments(xcresult_path, out_html_path, log_path)
+    if attachments is not None:
+        if details:
+            if progress and not attachments.done():
+                progress("Exporting screenshots…")
+            screenshot_dir_relative, screenshot_map = attachments.result()
             if not screenshot_map:
                 screenshot_map = None
+        else:
+            _discard_attachments(attachments, export_run, out_html)
 
+    if progress:
+        progress("Writing report…")
     title = report_title or "XCTest Summary"
     _log(log_path, f"[html] Building HTML with title={title!r}, details_count={len(details) if details else 0}, screenshots={bool(screenshot_map)}")
-    html = build_html(
+    # The detail rows go to a sibling script the page loads, keeping the HTML itself small.
+    image_srcs = None
+    unreadable = 0
+    if embed_images and screenshot_map:
+        image_srcs = _image_data_uris(out_html.parent / screenshot_dir_relative, details, screenshot_map)
+        _log(log_path, f"[screenshots] Embedded {len(image_srcs)} screenshots as data URIs")
+        shown = {fn for files in _detail_screenshots(details, screenshot_map) for fn in (files or ())[:_MAX_IMAGES_PER_TEST]}
+        unreadable = len(shown) - len(image_srcs)
+        if unreadable:
+            _log(log_path, f"[screenshots] {unreadable} screenshot(s) could not be read; keeping {screenshot_dir_relative} for their links")
+    details_script = None
+    details_inline = None
+    if details and embed_images:
+        details_inline = _details_script(details, screenshot_dir_relative, screenshot_map, image_srcs, inline=True).decode("utf-8")
+    elif details:
+        details_script_path = out_html.with_name(f"{out_html.stem}_data.js")
+        try:
+            _write_details_script(str(details_script_path), details, screenshot_dir_relative, screenshot_map)
+            details_script = details_script_path.name
+            _log(log_path, f"[output] Wrote details data to {details_script_path}")
+        except Exception as exc:
+            _log(log_path, f"[output] ERROR writing details data: {exc}")
+            raise RuntimeError(f"Failed to write details data file: {exc}") from exc
+    html_parts = _html_parts(
         passed, failed, skipped, Path(xcresult_path).name, title, details,
         screenshot_dir_relative=screenshot_dir_relative,
         screenshot_map=screenshot_map,
+        details_script=details_script,
+        details_inline=details_inline,
+        image_srcs=image_srcs,
     )
-    _log(log_path, f"[html] Generated HTML length: {len(html)} bytes")
-    _log(log_path, f"[html] HTML contains 'chart.js': {'chart.js' in html.lower()}")
-    _log(log_path, f"[html] HTML contains 'canvas': {'canvas' in html.lower()}")
-    _log(log_path, f"[html] HTML contains 'Chart(': {'Chart(' in html}")
-    if details:
-        _log(log_path, f"[html] HTML contains details table: {'<table' in html}")
-        _log(log_path, f"[html] HTML contains {html.count('<tr>')} table rows")
+    _log(log_path, f"[html] Generated HTML length: {sum(map(len, html_parts))} characters in {len(html_parts)} fragments")
     try:
-        with open(out_html_path, "w", encoding="utf-8") as f:
-            f.write(html)
+        _write_html(out_html_path, html_parts)
         _log(log_path, f"[output] Successfully wrote HTML to {out_html_path}")
+        if write_gzip:
+            for path in (out_html_path, details_script and str(out_html.with_name(details_script))):
+                if path:
+                    _gzip_copy(path)
+                    _log(log_path, f"[output] Wrote {path}.gz")
     except Exception as exc:
         _log(log_path, f"[output] ERROR writing HTML: {exc}")
         raise RuntimeError(f"Failed to write HTML file: {exc}") from exc
 
+    if pdf_html_path:
+        pdf_parts = _html_parts(
+            passed, failed, skipped, Path(xcresult_path).name, title, details,
+            screenshot_dir_relative=screenshot_dir_relative,
+            screenshot_map=screenshot_map,
+            for_pdf=True,
+            image_srcs=image_srcs,
+        )
+        try:
+            _write_html(pdf_html_path, pdf_parts)
+            _log(log_path, f"[output] Wrote PDF source HTML to {pdf_html_path}")
+        except Exception as exc:
+            _log(log_path, f"[output] ERROR writing PDF source HTML: {exc}")
+            raise RuntimeError(f"Failed to write HTML file: {exc}") from exc
+
+    if image_srcs is not None and not unreadable:
+        # Everything shown is embedded now; the exported files are no longer referenced.
+        shutil.rmtree(out_html.parent / screenshot_dir_relative, ignore_errors=True)
+
     _log(log_path, f"[output] html={out_html_path}")
-    _log(log_path, f"[output] extracted_json={debug_json_path}")
+    if debug_json:
+        _log(log_path, f"[output] extracted_json={debug_json_path}")
     return passed, failed, skipped
 
 
+def _write_html(path: str, parts: List[str]) -> None:
+    """Stream report fragments through a 1 MiB buffer; the whole document is never joined in memory."""
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.writelines(parts)
+
+
+def _gzip_copy(path: str) -> None:
+    """Write path + ".gz" next to path, streaming the file through gzip."""
+    with open(path, "rb") as src, gzip.open(path + ".gz", "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+
+
+@functools.lru_cache(maxsize=1)
+def _weasy():
+    """Import WeasyPrint and set up fonts once per process.
+
+    Returns (HTML class, FontConfiguration). The import stays lazy to avoid
+    noisy warnings at startup, but later PDF exports in the same process
+    reuse both. Raises if WeasyPrint or its system libraries are missing.
+    """
+    from weasyprint import HTML  # type: ignore
+
+    try:
+        from weasyprint.text.fonts import FontConfiguration  # type: ignore
+    except ImportError:  # WeasyPrint < 53
+        from weasyprint.fonts import FontConfiguration  # type: ignore
+    return HTML, FontConfiguration()
+
+
+def _load_summary(
+    xcresult_path: str,
+    out_html: Path,
+    log_path: str,
+    debug_json_path: Optional[str],
+    run: Optional["_CancellableRun"] = None,
+):
+    """Run xcresulttool for the summary and parse it.
+
+    xcresulttool writes into a temp file next to the output; it is parsed from there
+    and only kept (renamed to debug_json_path) when debug_json_path is set.
+    """
+    fd, json_path = tempfile.mkstemp(prefix=f".{out_html.stem}.", suffix=".json", dir=str(out_html.parent))
+    os.close(fd)
+    scanner = _SummaryScanner() if _IJSON_AVAILABLE else None
+    try:
+        json_size, err_text, cmd_text = run_xcresulttool(xcresult_path, json_path, scanner, run)
+    except BaseException:
+        _remove_quietly(json_path)
+        raise
+    _log(log_path, f"[xcresulttool] cmd={cmd_text}")
+    if err_text.strip():
+        _log(log_path, "[xcresulttool] stderr:\n" + err_text.strip())
+    _log(log_path, f"[xcresulttool] stdout_len={json_size}")
+
+    if not json_size:
+        details = ""
+        if cmd_text:
+            details += f"Command: {cmd_text}\n\n"
+        if err_text.strip():
+            details += f"Error output:\n{err_text.strip()}\n"
+        else:
+            details += "No error output captured."
+        raise RuntimeError("Failed to extract summary from xcresult.\n\n" + details)
+
+    try:
+        data = _read_summary_json(json_path, json_size, log_path, scanner)
+    finally:
+        if debug_json_path:
+            try:
+                os.replace(json_path, debug_json_path)
+            except OSError as exc:
+                _log(log_path, f"[json] Could not keep debug JSON: {exc}")
+        else:
+            _remove_quietly(json_path)
+
+    return data
+
+
+def _discard_attachments(attachments: Future, export_run: "_CancellableRun", out_html: Path) -> None:
+    """Kill an unneeded _export_attachments() run and delete what it exported."""
+    export_run.cancel()
+    try:
+        attachments.result()
+    except Exception:
+        pass
+    shutil.rmtree(out_html.parent / f"{out_html.stem}_screenshots", ignore_errors=True)
+
+
 def run_cli(
     xcresult_path: str,
     out_html_path: str,
@@ -251,17 +515,26 @@ def run_cli(
     report_title: Optional[str] = None,
     include_details: bool = False,
     include_screenshots: bool = False,
+    debug_json: bool = False,
+    embed_images: bool = False,
+    write_gzip: bool = False,
 ) -> int:
     """Run the tool in CLI mode.
 
     Returns an exit code (0 on success, non-zero on error).
     """
     resolved_log_path = log_path or _default_log_path()
+    # WeasyPrint reads a print-only copy next to the report (so relative screenshot paths resolve).
+    pdf_html_path = None
+    if pdf_output_path:
+        out_p = Path(out_html_path)
+        pdf_html_path = str(out_p.with_name(f".{out_p.stem}.pdf.html"))
     _log(resolved_log_path, "[cli] starting")
     _log(
         resolved_log_path,
         f"[cli] xcresult={xcresult_path} html={out_html_path} pdf={pdf_output_path} "
-        f"title={report_title!r} details={include_details} screenshots={include_screenshots}",
+        f"title={report_title!r} details={include_details} screenshots={include_screenshots} debug_json={debug_json} "
+        f"embed_images={embed_images} gzip={write_gzip}",
     )
     try:
         passed, failed, skipped = _process_xcresult_to_html(
@@ -271,6 +544,10 @@ def run_cli(
             report_title=report_title,
             include_details=include_details,
             include_screenshots=include_screenshots,
+            debug_json=debug_json,
+            pdf_html_path=pdf_html_path,
+            embed_images=embed_images,
+            write_gzip=write_gzip,
         )
     except Exception as exc:
         _log(resolved_log_path, f"[cli] error: {exc}")
@@ -285,88 +562,468 @@ def run_cli(
 
     if pdf_output_path:
         try:
-            from weasyprint import HTML as WeasyHTML  # type: ignore
-        except Exception as exc:
-            _log(resolved_log_path, f"[cli] weasyprint import_error={exc}")
-            print(
-                "Warning: WeasyPrint is not available or missing system dependencies; "
-                "skipping PDF generation.",
-                file=sys.stderr,
-            )
-            return 0
+            return _write_cli_pdf(pdf_html_path, pdf_output_path, resolved_log_path)
+        finally:
+            _remove_quietly(pdf_html_path)
 
-        try:
-            _log(resolved_log_path, f"[cli] Loading HTML file with WeasyPrint: {out_html_path}")
-            html_doc = WeasyHTML(filename=out_html_path)
-            _log(resolved_log_path, f"[cli] HTML document loaded, writing PDF to {pdf_output_path}")
-            html_doc.write_pdf(pdf_output_path)
-            _log(resolved_log_path, f"[cli] PDF write completed")
-            # Verify PDF was created
-            if Path(pdf_output_path).exists():
-                pdf_size = Path(pdf_output_path).stat().st_size
-                _log(resolved_log_path, f"[cli] PDF file exists, size: {pdf_size} bytes")
-                if pdf_size == 0:
-                    _log(resolved_log_path, "[cli] WARNING: PDF file is empty (0 bytes)")
-            else:
-                _log(resolved_log_path, "[cli] WARNING: PDF file was not created")
-            _log(resolved_log_path, "[cli] NOTE: WeasyPrint does not execute JavaScript, so Chart.js pie chart will not render in PDF. The chart will only appear when viewing the HTML in a browser.")
-        except Exception as exc:
-            _log(resolved_log_path, f"[cli] pdf_error={exc}")
-            _log(resolved_log_path, f"[cli] Exception type: {type(exc).__name__}")
-            import traceback
-            _log(resolved_log_path, f"[cli] Traceback:\n{traceback.format_exc()}")
-            print(f"Error while generating PDF: {exc}", file=sys.stderr)
-            return 1
+    return 0
 
-        print(f"PDF report written to: {pdf_output_path}")
 
+def _run_one(job: Tuple[str, str, str, Optional[str], bool, bool, bool, bool, bool]) -> Tuple[int, str]:
+    """Worker for run_cli_batch(): run_cli() for one bundle with its console output captured."""
+    (xcresult_path, out_html_path, log_path, report_title, include_details, include_screenshots, debug_json,
+     embed_images, write_gzip) = job
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
+        code = run_cli(
+            xcresult_path=xcresult_path,
+            out_html_path=out_html_path,
+            log_path=log_path,
+            report_title=report_title,
+            include_details=include_details,
+            include_screenshots=include_screenshots,
+            debug_json=debug_json,
+            embed_images=embed_images,
+            write_gzip=write_gzip,
+        )
+    return code, buf.getvalue()
+
+
+def run_cli_batch(
+    xcresult_paths: List[str],
+    out_dir: str,
+    jobs: int,
+    log_path: Optional[str] = None,
+    report_title: Optional[str] = None,
+    include_details: bool = False,
+    include_screenshots: bool = False,
+    debug_json: bool = False,
+    embed_images: bool = False,
+    write_gzip: bool = False,
+) -> int:
+    """Convert several bundles in parallel, one worker process per bundle.
+
+    Reports are named after each bundle (Tests.xcresult -> out_dir/Tests.html,
+    numbered if taken) and each gets its own log file derived from log_path.
+    Returns 0 if every bundle succeeded, otherwise 1.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    base_log = Path(log_path or _default_log_path())
+    taken = set()
+    batch = []
+    for xcresult_path in xcresult_paths:
+        # Names are picked here, not in the workers, so two bundles with the same name cannot race.
+        html_path = _next_available_report_path(str(out / f"{Path(xcresult_path.rstrip(os.sep)).stem}.html"), taken)
+        taken.add(html_path)
+        bundle_log = str(base_log.with_name(f"{base_log.stem}_{Path(html_path).stem}{base_log.suffix}"))
+        batch.append((xcresult_path, html_path, bundle_log, report_title, include_details, include_screenshots, debug_json, embed_images, write_gzip))
+
+    exit_code = 0
+    with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(batch)))) as ex:
+        # map() yields in submission order, so console output stays grouped per bundle.
+        for code, output in ex.map(_run_one, batch):
+            sys.stdout.write(output)
+            if code:
+                exit_code = 1
+    return exit_code
+
+
+def _write_cli_pdf(pdf_html_path: str, pdf_output_path: str, resolved_log_path: str) -> int:
+    """Render the print-only report variant to PDF for run_cli; returns an exit code."""
+    try:
+        WeasyHTML, font_config = _weasy()
+    except Exception as exc:
+        _log(resolved_log_path, f"[cli] weasyprint import_error={exc}")
+        print(
+            "Warning: WeasyPrint is not available or missing system dependencies; "
+            "skipping PDF generation.",
+            file=sys.stderr,
+        )
+        return 0
+
+    try:
+        _log(resolved_log_path, f"[cli] Loading HTML file with WeasyPrint: {pdf_html_path}")
+        html_doc = WeasyHTML(filename=pdf_html_path)
+        _log(resolved_log_path, f"[cli] HTML document loaded, writing PDF to {pdf_output_path}")
+        html_doc.write_pdf(pdf_output_path, font_config=font_config)
+        _log(resolved_log_path, f"[cli] PDF write completed")
+        # Verify PDF was created (one stat call for existence and size)
+        try:
+            pdf_size = os.stat(pdf_output_path).st_size
+        except OSError:
+            _log(resolved_log_path, "[cli] WARNING: PDF file was not created")
+        else:
+            _log(resolved_log_path, f"[cli] PDF file exists, size: {pdf_size} bytes")
+            if pdf_size == 0:
+                _log(resolved_log_path, "[cli] WARNING: PDF file is empty (0 bytes)")
+    except Exception as exc:
+        _log(resolved_log_path, f"[cli] pdf_error={exc}")
+        _log(resolved_log_path, f"[cli] Exception type: {type(exc).__name__}")
+        import traceback
+        _log(resolved_log_path, f"[cli] Traceback:\n{traceback.format_exc()}")
+        print(f"Error while generating PDF: {exc}", file=sys.stderr)
+        return 1
+
+    print(f"PDF report written to: {pdf_output_path}")
     return 0
 
 
-def run_xcresulttool(xcresult_path: str) -> Tuple[Optional[str], str, str]:
+@functools.lru_cache(maxsize=1)
+def _xcrun_path() -> str:
+    """Absolute path of xcrun, looked up on PATH once per process."""
+    return shutil.which("xcrun") or "/usr/bin/xcrun"
+
+
+@functools.lru_cache(maxsize=1)
+def _xcresulttool_cmd() -> Tuple[str, ...]:
+    """Command prefix used to invoke xcresulttool, resolved once per process.
+
+    Prefers $XCRESULTTOOL_PATH, then the absolute path reported by
+    `xcrun --find xcresulttool` so later calls skip xcrun's tool lookup.
+    Falls back to running the tool through xcrun.
+    """
+    override = os.environ.get("XCRESULTTOOL_PATH")
+    if override:
+        return (override,)
+    xcrun_path = _xcrun_path()
+    try:
+        found = subprocess.run([xcrun_path, "--find", "xcresulttool"], capture_output=True, text=True, check=False)
+    except OSError:
+        return (xcrun_path, "xcresulttool")
+    tool_path = (found.stdout or "").strip()
+    if found.returncode == 0 and tool_path:
+        return (tool_path,)
+    return (xcrun_path, "xcresulttool")
+
+
+@functools.lru_cache(maxsize=1)
+def _xcresulttool_version() -> Optional[int]:
+    """xcresulttool build number from `xcresulttool version`, or None if unknown."""
+    try:
+        result = subprocess.run([*_xcresulttool_cmd(), "version"], capture_output=True, text=True, check=False)
+    except OSError:
+        return None
+    match = re.search(r"version\s+(\d+)", result.stdout or "")
+    return int(match.group(1)) if match else None
+
+
+def run_xcresulttool(
+    xcresult_path: str,
+    out_json_path: str,
+    scanner: Optional["_SummaryScanner"] = None,
+    run: Optional["_CancellableRun"] = None,
+) -> Tuple[int, str, str]:
     """Run xcresulttool to get SUMMARY JSON only. Used for counts and simple report.
 
     Always prefers the summary command so extract_counts() receives the expected
     schema (passedTests, failedTests, skippedTests). Do not use full bundle JSON
     here or counts will be wrong.
 
-    Returns: (stdout_or_none, stderr_text, command_string)
+    stdout is teed to out_json_path while the tool runs; the caller parses the
+    JSON from that file. When a scanner is given and the output grows past
+    _STREAMING_JSON_THRESHOLD, the chunks are also pushed into it as they
+    arrive, so parsing overlaps with xcresulttool still writing. On failure
+    the file is removed. Cancelling run kills the tool and raises RuntimeError.
+
+    Returns: (stdout_size_in_bytes_or_0, stderr_text, command_string)
     """
     xcresult_path = os.path.abspath(xcresult_path)
-    xcrun_path = shutil.which("xcrun") or "/usr/bin/xcrun"
+    tool = list(_xcresulttool_cmd())
 
-    candidates = [
-        [xcrun_path, "xcresulttool", "get", "test-results", "summary", "--path", xcresult_path, "--compact"],
-        [xcrun_path, "xcresulttool", "get", "--legacy", "--path", xcresult_path, "--format", "json"],
-        [xcrun_path, "xcresulttool", "get", "--path", xcresult_path, "--format", "json"],
-    ]
+    summary_cmd = tool + ["get", "test-results", "summary", "--path", xcresult_path, "--compact"]
+
+    def candidates():
+        yield summary_cmd
+        yield tool + ["get", "--legacy", "--path", xcresult_path, "--format", "json"]
+        # The version probe is another subprocess, so it only runs once both commands above failed.
+        version = _xcresulttool_version()
+        if version is None or version < _XCRESULTTOOL_LEGACY_ONLY_VERSION:
+            yield tool + ["get", "--path", xcresult_path, "--format", "json"]
 
     last_stderr = ""
     last_cmd = ""
-    for cmd in candidates:
+    Path(out_json_path).parent.mkdir(parents=True, exist_ok=True)
+    for cmd in candidates():
         last_cmd = " ".join(cmd)
+        if scanner is not None:
+            scanner.reset()
+        try:
+            returncode, out_size, stderr_text = _run_to_file(cmd, out_json_path, scanner, run)
+        except OSError as exc:
+            _remove_quietly(out_json_path)
+            return 0, f"Could not execute {cmd[0]}: {exc}", last_cmd
+
+        if out_size > MAX_JSON_BYTES:
+            # The fallbacks only produce larger documents, so stop here.
+            _remove_quietly(out_json_path)
+            return 0, f"xcresulttool output exceeded {MAX_JSON_BYTES // (1024 * 1024)} MiB; refusing to parse it.", last_cmd
+
+        if returncode == 0 and out_size:
+            return out_size, stderr_text, last_cmd
+
+        if returncode == 0 and cmd is summary_cmd:
+            # The summary command worked; falling back to full bundle JSON would only be slower.
+            _remove_quietly(out_json_path)
+            return 0, stderr_text or "xcresulttool summary produced no output.", last_cmd
+
+        if stderr_text.strip():
+            last_stderr = stderr_text
+
+    _remove_quietly(out_json_path)
+    return 0, last_stderr, last_cmd
+
+
+def _run_to_file(
+    cmd: List[str],
+    out_path: str,
+    scanner: Optional["_SummaryScanner"],
+    run: Optional["_CancellableRun"] = None,
+) -> Tuple[int, int, str]:
+    """Run cmd, teeing stdout into out_path (and scanner once it is large).
+
+    Both pipes are drained with select() so a chatty stderr cannot stall the
+    tool. The tool is killed once stdout passes MAX_JSON_BYTES.
+    Returns (returncode, stdout_size, stderr_text).
+    """
+    run = run or _CancellableRun()
+    proc = run.start(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if proc is None:
+        raise RuntimeError("Report generation was cancelled.")
+    out_fd = proc.stdout.fileno()
+    err_fd = proc.stderr.fileno()
+    stderr_chunks: List[bytes] = []
+    out_size = 0
+    try:
+        with open(out_path, "wb") as out:
+            open_fds = [out_fd, err_fd]
+            while open_fds:
+                ready, _, _ = select.select(open_fds, [], [])
+                for fd in ready:
+                    chunk = os.read(fd, _PIPE_READ_CHUNK)
+                    if not chunk:
+                        open_fds.remove(fd)
+                    elif fd == err_fd:
+                        stderr_chunks.append(chunk)
+                    else:
+                        out.write(chunk)
+                        out_size += len(chunk)
+                        if out_size > MAX_JSON_BYTES:
+                            proc.kill()
+                            open_fds = []
+                            break
+                        if scanner is None:
+                            continue
+                        if scanner.started:
+                            scanner.push(chunk)
+                        elif out_size > _STREAMING_JSON_THRESHOLD:
+                            # Catch up on what is already on disk, then keep pushing live.
+                            out.flush()
+                            with open(out_path, "rb") as written:
+                                for block in iter(lambda: written.read(_PIPE_READ_CHUNK), b""):
+                                    scanner.push(block)
+        if scanner is not None and scanner.started:
+            scanner.close()
+    finally:
+        proc.stdout.close()
+        proc.stderr.close()
+        returncode = proc.wait()
+    return returncode, out_size, b"".join(stderr_chunks).decode("utf-8", "replace")
+
+
+def _read_summary_json(json_path: str, json_size: int, log_path: str, scanner: Optional["_SummaryScanner"] = None):
+    """Parse xcresulttool output from json_path, or take the result of a streaming scan."""
+    data = None
+    if scanner is not None and scanner.started:
+        data = scanner.result(log_path)
+    if data is None:
+        try:
+            data = _load_json_file(json_path)
+            _log(log_path, f"[json] Successfully parsed JSON (orjson={_ORJSON_AVAILABLE}), top-level keys: {list(data.keys())[:10] if isinstance(data, dict) else 'not a dict'}")
+        except Exception as exc:
+            _log(log_path, f"[json] ERROR parsing JSON: {exc}")
+            _log(log_path, f"[json] JSON length: {json_size} bytes")
+            try:
+                with open(json_path, "rb") as f:
+                    preview = f.read(500).decode("utf-8", "replace")
+            except OSError:
+                preview = "None"
+            _log(log_path, f"[json] JSON preview (first 500 bytes): {preview}")
+            raise RuntimeError(f"Failed to parse JSON summary: {exc}") from exc
+    return data
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _load_json_file(path: str):
+    """Parse a JSON file through mmap so orjson reads the pages without an extra copy."""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if _ORJSON_AVAILABLE:
+                with memoryview(mm) as view:
+                    return _json.loads(view)
+            return _json.loads(mm[:])
+
+class _SummaryScanner:
+    """Collect summary counts and testFailures from JSON bytes pushed into ijson.
+
+    Only the top-level count keys and the top-level testFailures array are
+    materialised, so memory grows with the number of failures rather than
+    with the size of the whole document. Parse errors are recorded rather
+    than raised so the subprocess pipes keep draining.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.summary: dict = {}
+        self.error: Optional[Exception] = None
+        self._builder = None
+        self._events = None
+        self._coro = None
+
+    @property
+    def started(self) -> bool:
+        return self._coro is not None
+
+    def push(self, chunk: bytes) -> None:
+        if self.error is not None:
+            return
+        try:
+            if self._coro is None:
+                self._events = ijson.sendable_list()
+                self._coro = ijson.parse_coro(self._events)
+            self._coro.send(chunk)
+            self._drain()
+        except Exception as exc:
+            self.error = exc
+
+    def close(self) -> None:
+        if self._coro is None or self.error is not None:
+            return
+        try:
+            self._coro.close()
+            self._drain()
+        except Exception as exc:
+            self.error = exc
+
+    def _drain(self) -> None:
+        for prefix, event, value in self._events:
+            self.feed(prefix, event, value)
+        del self._events[:]
+
+    def feed(self, prefix: str, event: str, value) -> None:
+        if self._builder is not None:
+            self._builder.event(event, value)
+            if prefix == "testFailures" and event == "end_array":
+                self.summary["testFailures"] = self._builder.value
+                self._builder = None
+            return
+        if prefix == "testFailures" and event == "start_array":
+            self._builder = ijson.ObjectBuilder()
+            self._builder.event(event, value)
+        elif prefix in _SUMMARY_COUNT_KEYS and event == "number":
+            self.summary[prefix] = value
+
+    def has_counts(self) -> bool:
+        """True only if the top-level keys alone give counts, as the full parse would."""
+        return _match_counts(self.summary) is not None
+
+    def result(self, log_path: str) -> Optional[dict]:
+        """Return a reduced summary dict (count keys plus testFailures) that
+        extract_counts() and _extract_details_from_summary() understand, or
+        None if the caller should fully parse the file instead.
+        """
+        if self.error is not None:
+            _log(log_path, f"[json] Streaming scan failed, falling back to full parse: {self.error}")
+            return None
+        if not self.has_counts():
+            _log(log_path, "[json] Streaming scan found no complete top-level counts, falling back to full parse")
+            return None
+        _log(log_path, f"[json] Streaming scan ({ijson.backend}) found keys: {sorted(self.summary)}")
+        return self.summary
+
+
+# Keys that can mark a dict holding test counts; any other dict is only descended into.
+_COUNT_KEYS = frozenset((
+    "passedTests", "failedTests", "totalTestCount",
+    "passed", "failed",
+    "testsPassedCount", "testsFailedCount",
+    "passedCount", "failedCount",
+))
+# Subtrees that never hold run-level counts (per-test activities, references, coverage);
+# skipping them saves most of the walk on full-bundle (--legacy) JSON.
+_SKIP_KEYS = frozenset((
+    "activitySummaries", "subtests", "logRef", "diagnosticReportRef", "coverage", "archiveRef",
+))
+
+
+def _unwrap(v):
+    if isinstance(v, dict) and "_value" in v:
+        return v["_value"]
+    return v
+
+
+def _match_counts(node: dict) -> Optional[Tuple[int, int, int]]:
+    """Apply the known count patterns to a single dict; None if none match."""
+    # Pattern 0: summary JSON keys seen in practice (passedTests/failedTests/skippedTests)
+    if "passedTests" in node and "failedTests" in node:
+        try:
+            p = int(_unwrap(node.get("passedTests", 0)) or 0)
+            f = int(_unwrap(node.get("failedTests", 0)) or 0)
+            s = int(_unwrap(node.get("skippedTests", 0)) or 0)
+            return p, f, s
+        except Exception:
+            pass
+
+    # Sometimes: totalTestCount + failedTests (+ skippedTests)
+    if "totalTestCount" in node and ("failedTests" in node or "testsFailedCount" in node):
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        except FileNotFoundError as exc:
-            return None, f"Could not execute {cmd[0]}: {exc}", last_cmd
+            total = int(_unwrap(node.get("totalTestCount", 0)) or 0)
+            f = int(_unwrap(node.get("failedTests", node.get("testsFailedCount", 0))) or 0)
+            s = int(_unwrap(node.get("skippedTests", node.get("testsSkippedCount", 0))) or 0)
+            p = max(total - f - s, 0)
+            return p, f, s
+        except Exception:
+            pass
 
-        if result.returncode == 0 and (result.stdout or "").strip():
-            return result.stdout, (result.stderr or ""), last_cmd
+    # Pattern A: passed/failed/skipped
+    if "passed" in node and "failed" in node:
+        try:
+            p = int(_unwrap(node.get("passed", 0)) or 0)
+            f = int(_unwrap(node.get("failed", 0)) or 0)
+            s = int(_unwrap(node.get("skipped", 0)) or 0)
+            return p, f, s
+        except Exception:
+            pass
 
-        if (result.stderr or "").strip():
-            last_stderr = result.stderr
+    # Pattern B: tests*Count
+    if "testsPassedCount" in node and "testsFailedCount" in node:
+        try:
+            p = int(_unwrap(node.get("testsPassedCount", 0)) or 0)
+            f = int(_unwrap(node.get("testsFailedCount", 0)) or 0)
+            s = int(_unwrap(node.get("testsSkippedCount", 0)) or 0)
+            return p, f, s
+        except Exception:
+            pass
 
-    return None, last_stderr, last_cmd
+    # Alternate: *Count
+    if "passedCount" in node and "failedCount" in node:
+        try:
+            p = int(_unwrap(node.get("passedCount", 0)) or 0)
+            f = int(_unwrap(node.get("failedCount", 0)) or 0)
+            s = int(_unwrap(node.get("skippedCount", 0)) or 0)
+            return p, f, s
+        except Exception:
+            pass
 
-def deep_iter(obj):
-    """Recursively yield all dictionaries in a nested dict/list structure."""
-    if isinstance(obj, dict):
-        yield obj
-        for v in obj.values():
-            yield from deep_iter(v)
-    elif isinstance(obj, list):
-        for v in obj:
-            yield from deep_iter(v)
+    return None
 
 
 def extract_counts(data: dict) -> Tuple[int, int, int]:
@@ -378,67 +1035,26 @@ def extract_counts(data: dict) -> Tuple[int, int, int]:
       - Older schemas that use `testsPassedCount` / `testsFailedCount` / `testsSkippedCount`
       - Alternate schemas: `passedCount` / `failedCount` / `skippedCount`
       - Any nesting, plus numbers wrapped as {"_value": ...}
-    """
-    def unwrap(v):
-        if isinstance(v, dict) and "_value" in v:
-            return v["_value"]
-        return v
 
-    for node in deep_iter(data):
-        if not isinstance(node, dict):
+    The tree is walked breadth-first with an explicit queue, so the shallowest
+    matching dict wins and the walk stops as soon as one is found. Patterns are
+    only tried on dicts that contain at least one of `_COUNT_KEYS`, and values
+    under `_SKIP_KEYS` are never visited.
+    """
+    pending = deque([data])
+    while pending:
+        node = pending.popleft()
+        if isinstance(node, dict):
+            if not _COUNT_KEYS.isdisjoint(node):
+                counts = _match_counts(node)
+                if counts is not None:
+                    return counts
+            children = [v for k, v in node.items() if k not in _SKIP_KEYS]
+        elif isinstance(node, list):
+            children = node
+        else:
             continue
-        keys = set(node.keys())
-
-        # Pattern 0: summary JSON keys seen in practice (passedTests/failedTests/skippedTests)
-        if {"passedTests", "failedTests"}.issubset(keys):
-            try:
-                p = int(unwrap(node.get("passedTests", 0)) or 0)
-                f = int(unwrap(node.get("failedTests", 0)) or 0)
-                s = int(unwrap(node.get("skippedTests", 0)) or 0)
-                return p, f, s
-            except Exception:
-                pass
-
-        # Sometimes: totalTestCount + failedTests (+ skippedTests)
-        if "totalTestCount" in keys and ("failedTests" in keys or "testsFailedCount" in keys):
-            try:
-                total = int(unwrap(node.get("totalTestCount", 0)) or 0)
-                f = int(unwrap(node.get("failedTests", node.get("testsFailedCount", 0))) or 0)
-                s = int(unwrap(node.get("skippedTests", node.get("testsSkippedCount", 0))) or 0)
-                p = max(total - f - s, 0)
-                return p, f, s
-            except Exception:
-                pass
-
-        # Pattern A: passed/failed/skipped
-        if {"passed", "failed"}.issubset(keys):
-            try:
-                p = int(unwrap(node.get("passed", 0)) or 0)
-                f = int(unwrap(node.get("failed", 0)) or 0)
-                s = int(unwrap(node.get("skipped", 0)) or 0)
-                return p, f, s
-            except Exception:
-                pass
-
-        # Pattern B: tests*Count
-        if {"testsPassedCount", "testsFailedCount"}.issubset(keys):
-            try:
-                p = int(unwrap(node.get("testsPassedCount", 0)) or 0)
-                f = int(unwrap(node.get("testsFailedCount", 0)) or 0)
-                s = int(unwrap(node.get("testsSkippedCount", 0)) or 0)
-                return p, f, s
-            except Exception:
-                pass
-
-        # Alternate: *Count
-        if {"passedCount", "failedCount"}.issubset(keys):
-            try:
-                p = int(unwrap(node.get("passedCount", 0)) or 0)
-                f = int(unwrap(node.get("failedCount", 0)) or 0)
-                s = int(unwrap(node.get("skippedCount", 0)) or 0)
-                return p, f, s
-            except Exception:
-                pass
+        pending.extend(v for v in children if isinstance(v, (dict, list)))
 
     return 0, 0, 0
 
@@ -479,50 +1095,101 @@ def _extract_details_from_summary(data: dict, log_path: str) -> Optional[list]:
     return details if details else None
 
 
+class _CancellableRun:
+    """Subprocesses started on worker threads that another thread can kill.
+
+    cancel() kills every process started through start() that is still
+    running, and makes later start() calls refuse to launch anything.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._procs: List[subprocess.Popen] = []
+        self._children: List["_CancellableRun"] = []
+        self.cancelled = False
+
+    def start(self, cmd: List[str], **popen_kwargs) -> Optional[subprocess.Popen]:
+        """Popen cmd, or return None if already cancelled."""
+        with self._lock:
+            if self.cancelled:
+                return None
+            proc = subprocess.Popen(cmd, **popen_kwargs)
+            self._procs.append(proc)
+            return proc
+
+    def child(self) -> "_CancellableRun":
+        """A run that can be cancelled on its own and is also cancelled with this one."""
+        child = _CancellableRun()
+        with self._lock:
+            child.cancelled = self.cancelled
+            self._children.append(child)
+        return child
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            for proc in self._procs:
+                if proc.poll() is None:
+                    proc.kill()
+            children = list(self._children)
+        for child in children:
+            child.cancel()
+
+
 def _export_attachments(
     xcresult_path: str,
-    out_html_path: str,
+    out_html: Path,
     log_path: str,
+    run: Optional[_CancellableRun] = None,
 ) -> Tuple[Optional[str], Optional[Dict[str, List[str]]]]:
     """Export attachments (screenshots) from xcresult to a dir next to the HTML file.
 
     Returns (screenshot_dir_relative_to_html, map of testIdentifier -> [exported filenames])
     or (None, None) on failure or if no attachments. Caller uses relative path for <img src>.
+    run lets the caller kill the export once it knows the result is not needed.
     """
     xcresult_path = os.path.abspath(xcresult_path)
-    out_dir = Path(out_html_path).parent
-    html_stem = Path(out_html_path).stem
-    screenshot_dir_name = f"{html_stem}_screenshots"
-    screenshot_abs = out_dir / screenshot_dir_name
+    screenshot_dir_name = f"{out_html.stem}_screenshots"
+    screenshot_abs = out_html.parent / screenshot_dir_name
     screenshot_abs.mkdir(parents=True, exist_ok=True)
 
-    xcrun_path = shutil.which("xcrun") or "/usr/bin/xcrun"
     cmd = [
-        xcrun_path, "xcresulttool", "export", "attachments",
+        *_xcresulttool_cmd(), "export", "attachments",
         "--path", xcresult_path,
         "--output-path", str(screenshot_abs),
     ]
     _log(log_path, f"[screenshots] Running: {' '.join(cmd)}")
+    run = run or _CancellableRun()
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=120)
-    except subprocess.TimeoutExpired:
-        _log(log_path, "[screenshots] Export timed out")
-        return None, None
+        proc = run.start(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if proc is None:
+            _log(log_path, "[screenshots] Export cancelled before it started")
+            return None, None
+        try:
+            _, stderr = proc.communicate(timeout=120)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            _log(log_path, "[screenshots] Export timed out")
+            return None, None
     except Exception as exc:
         _log(log_path, f"[screenshots] Export failed: {exc}")
         return None, None
 
-    if result.returncode != 0:
-        _log(log_path, f"[screenshots] xcresulttool exit {result.returncode}: {result.stderr or ''}")
+    if run.cancelled:
+        _log(log_path, "[screenshots] Export cancelled")
+        return None, None
+    if proc.returncode != 0:
+        _log(log_path, f"[screenshots] xcresulttool exit {proc.returncode}: {stderr or ''}")
         return None, None
 
     manifest_path = screenshot_abs / "manifest.json"
-    if not manifest_path.exists():
+    try:
+        # Bytes go straight to the parser (orjson when available); no separate decode pass.
+        manifest = _json.loads(manifest_path.read_bytes())
+    except FileNotFoundError:
         _log(log_path, "[screenshots] No manifest.json; no attachments or different format")
         return screenshot_dir_name, {}  # Dir may have files; no per-test mapping
-
-    try:
-        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
     except Exception as exc:
         _log(log_path, f"[screenshots] Failed to parse manifest: {exc}")
         return screenshot_dir_name, {}
@@ -558,100 +1225,195 @@ def _export_attachments(
                 by_id[url] = filenames
 
     _log(log_path, f"[screenshots] Manifest: {len(by_id)} test(s) with attachments")
+    if by_id:
+        removed = _dedupe_screenshots(screenshot_abs, by_id)
+        if removed:
+            _log(log_path, f"[screenshots] Removed {removed} duplicate file(s)")
     return screenshot_dir_name, by_id if by_id else None
 
 
-def build_html(
-    passed: int,
-    failed: int,
-    skipped: int,
-    source_name: str,
-    title: str,
-    details: Optional[list] = None,
-    screenshot_dir_relative: Optional[str] = None,
-    screenshot_map: Optional[Dict[str, List[str]]] = None,
-) -> str:
-    """Construct an HTML report containing test counts, a pie chart, optional details, and optional screenshots.
+def _dedupe_screenshots(screenshot_abs: Path, by_id: Dict[str, List[str]]) -> int:
+    """Point identical exported files at one copy, in place, and delete the rest.
 
-    The pie chart is drawn via Chart.js loaded from a CDN.  The layout uses
-    simple CSS for readability.  The source filename is displayed at the bottom.
-    screenshot_map: testIdentifier or testIdentifierURL -> list of exported filenames (in screenshot_dir_relative).
+    Xcode often attaches the same screenshot to many steps or tests. Only
+    files whose size matches another file's are hashed (SHA-1). Returns the
+    number of files removed.
     """
+    by_size: Dict[int, List[str]] = {}
+    for name in dict.fromkeys(fn for files in by_id.values() for fn in files):
+        try:
+            by_size.setdefault(os.stat(screenshot_abs / name).st_size, []).append(name)
+        except OSError:
+            continue
+    canonical: Dict[str, str] = {}
+    for names in by_size.values():
+        if len(names) < 2:
+            continue
+        first_by_digest: Dict[bytes, str] = {}
+        for name in names:
+            try:
+                digest = hashlib.sha1((screenshot_abs / name).read_bytes()).digest()
+            except OSError:
+                continue
+            keep = first_by_digest.setdefault(digest, name)
+            if keep != name:
+                canonical[name] = keep
+    if not canonical:
+        return 0
+    for test_id, files in by_id.items():
+        # Same order, each image once per test.
+        by_id[test_id] = list(dict.fromkeys(canonical.get(fn, fn) for fn in files))
+    for name in canonical:
+        _remove_quietly(str(screenshot_abs / name))
+    return len(canonical)
+
+
+# Whitespace between tags; the templates below are written indented for
+# readability and compacted once at import, so reports carry no indentation.
+_WS_BETWEEN_TAGS = re.compile(r">\s+<")
+
+
+def _compact_html(template: str) -> str:
+    return _WS_BETWEEN_TAGS.sub("><", template).strip()
+
+
+_THEME_TOGGLE_HTML = _compact_html("""
+  <div class="theme-toggle">
+    <button type="button" onclick="document.body.classList.toggle('light-theme'); this.textContent = document.body.classList.contains('light-theme') ? 'Dark' : 'Light';" aria-label="Toggle light/dark theme">Light</button>
+  </div>""")
+
+
+def _svg_pie(passed: int, failed: int, skipped: int) -> str:
+    """Render the passed/failed/skipped pie chart with its legend as inline SVG.
+
+    Slices start at 12 o'clock and run clockwise (like the former Chart.js
+    pie). Legend text uses currentColor so it follows the theme and print CSS.
+    """
+    cx, cy, r = 160.0, 110.0, 100.0
+    slices = [("Passed", passed, "#22c55e"), ("Failed", failed, "#ef4444"), ("Skipped", skipped, "#f59e0b")]
     total = passed + failed + skipped
-    # Use f-string to embed numbers; Chart.js will read these values.
-    html = f"""<!doctype html>
+    shapes: List[str] = []
+    angle = -math.pi / 2
+    for label, value, color in slices:
+        if value <= 0:
+            continue
+        tooltip = f"<title>{label}: {value}</title>"
+        if value == total:
+            shapes.append(f'<circle cx="{cx:g}" cy="{cy:g}" r="{r:g}" fill="{color}">{tooltip}</circle>')
+            break
+        sweep = 2 * math.pi * value / total
+        x1, y1 = cx + r * math.cos(angle), cy + r * math.sin(angle)
+        angle += sweep
+        x2, y2 = cx + r * math.cos(angle), cy + r * math.sin(angle)
+        large_arc = 1 if sweep > math.pi else 0
+        shapes.append(
+            f'<path d="M{cx:g},{cy:g} L{x1:.2f},{y1:.2f} A{r:g},{r:g} 0 {large_arc},1 {x2:.2f},{y2:.2f} Z" '
+            f'fill="{color}">{tooltip}</path>'
+        )
+    if not shapes:
+        shapes.append(f'<circle cx="{cx:g}" cy="{cy:g}" r="{r:g}" fill="#404040"><title>No tests</title></circle>')
+    for i, (label, _value, color) in enumerate(slices):
+        x = 40 + 80 * i
+        shapes.append(
+            f'<rect x="{x}" y="226" width="12" height="12" rx="2" fill="{color}" />'
+            f'<text x="{x + 18}" y="236" font-size="12" fill="currentColor">{label}</text>'
+        )
+    return (
+        f'<svg class="pie" viewBox="0 0 320 250" role="img" '
+        f'aria-label="Passed {passed}, failed {failed}, skipped {skipped}">{"".join(shapes)}</svg>'
+    )
+
+
+# Single-pass HTML escaping for text taken from the xcresult (test names, failure messages, ...).
+_HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"})
+
+
+def _esc(value) -> str:
+    """Escape text for HTML element content and quoted attribute values."""
+    if not value:
+        return ""
+    return str(value).translate(_HTML_ESCAPE_TABLE)
+
+
+# Static report markup. Only _SUMMARY_CARD_TPL has placeholders (str.format);
+# the head and style sheet are plain strings, so CSS braces need no escaping.
+_HTML_HEAD_OPEN = _compact_html("""<!doctype html>
 <html lang="en">
 <head>
   <meta charset="utf-8" />
-  <title>{title}</title>
+  <title>""")
+# The style sheet has no whitespace-sensitive content, so every run collapses to one space.
+_HTML_STYLE_AND_BODY_OPEN = _compact_html(re.sub(r"\s+", " ", """</title>
   <meta name="viewport" content="width=device-width, initial-scale=1" />
   <meta name="color-scheme" content="dark" />
   <style>
     /* Dark theme (default) */
-    body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto,
-                Arial, sans-serif; margin: 32px; background: #1a1a1a; color: #e0e0e0; }}
-    .card {{ border: 1px solid #3a3a3a; border-radius: 12px; padding: 20px;
-             max-width: 720px; box-shadow: 0 4px 12px rgba(0,0,0,0.3); background: #2b2b2b; }}
-    h1, h2 {{ margin: 0 0 8px 0; font-size: 22px; color: #fff; }}
-    h2 {{ font-size: 18px; margin-top: 4px; }}
-    .meta {{ color: #9ca3af; margin-bottom: 16px; font-size: 14px; }}
-    .grid {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 10px;
-             margin: 16px 0 12px; }}
-    .kpi {{ border: 1px solid #3a3a3a; border-radius: 10px; padding: 12px;
-            text-align: center; background: #1f1f1f; }}
-    .kpi .label {{ color: #9ca3af; font-size: 12px; }}
-    .kpi .value {{ font-size: 20px; margin-top: 6px; color: #fff; }}
-    .small {{ color: #9ca3af; font-size: 12px; margin-top: 10px; }}
-    canvas {{ max-width: 520px; margin: auto; }}
-    table {{ color: #e0e0e0; }}
-    th {{ color: #d1d5db; }}
-    .theme-toggle {{ margin-bottom: 12px; }}
-    .theme-toggle button {{ background: #3a3a3a; color: #e0e0e0; border: 1px solid #555;
-      padding: 6px 12px; border-radius: 6px; cursor: pointer; font-size: 13px; }}
-    .theme-toggle button:hover {{ background: #4a4a4a; }}
-    .screenshot-row {{ background: #1f1f1f; }}
-    .screenshot-row .screenshot-label {{ color: #9ca3af; }}
+    body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto,
+                Arial, sans-serif; margin: 32px; background: #1a1a1a; color: #e0e0e0; }
+    .card { border: 1px solid #3a3a3a; border-radius: 12px; padding: 20px;
+             max-width: 720px; box-shadow: 0 4px 12px rgba(0,0,0,0.3); background: #2b2b2b; }
+    h1, h2 { margin: 0 0 8px 0; font-size: 22px; color: #fff; }
+    h2 { font-size: 18px; margin-top: 4px; }
+    .meta { color: #9ca3af; margin-bottom: 16px; font-size: 14px; }
+    .grid { display: grid; grid-template-columns: repeat(4, 1fr); gap: 10px;
+             margin: 16px 0 12px; }
+    .kpi { border: 1px solid #3a3a3a; border-radius: 10px; padding: 12px;
+            text-align: center; background: #1f1f1f; }
+    .kpi .label { color: #9ca3af; font-size: 12px; }
+    .kpi .value { font-size: 20px; margin-top: 6px; color: #fff; }
+    .small { color: #9ca3af; font-size: 12px; margin-top: 10px; }
+    .pie { display: block; width: 100%; max-width: 420px; margin: 8px auto 0; color: #d1d5db; }
+    .pie path, .pie circle { stroke: #2b2b2b; stroke-width: 2; }
+    table { color: #e0e0e0; }
+    th { color: #d1d5db; }
+    .theme-toggle { margin-bottom: 12px; }
+    .theme-toggle button { background: #3a3a3a; color: #e0e0e0; border: 1px solid #555;
+      padding: 6px 12px; border-radius: 6px; cursor: pointer; font-size: 13px; }
+    .theme-toggle button:hover { background: #4a4a4a; }
+    .screenshot-row { background: #1f1f1f; }
+    .screenshot-row .screenshot-label { color: #9ca3af; }
 
     /* Light theme (when body has .light-theme) */
-    body.light-theme {{ background: #f5f5f5; color: #1a1a1a; }}
-    body.light-theme .card {{ background: #fff; border-color: #ddd; box-shadow: 0 2px 8px rgba(0,0,0,0.08); }}
-    body.light-theme h1, body.light-theme h2 {{ color: #111; }}
-    body.light-theme .meta, body.light-theme .small, body.light-theme .kpi .label {{ color: #555; }}
-    body.light-theme .kpi {{ background: #f9f9f9; border-color: #ddd; }}
-    body.light-theme .kpi .value {{ color: #111; }}
-    body.light-theme table {{ color: #1a1a1a; }}
-    body.light-theme th {{ color: #333; }}
-    body.light-theme .theme-toggle button {{ background: #e5e5e5; color: #1a1a1a; border-color: #ccc; }}
-    body.light-theme .theme-toggle button:hover {{ background: #d5d5d5; }}
-    body.light-theme .screenshot-row {{ background: #f5f5f5; }}
-    body.light-theme .screenshot-row .screenshot-label {{ color: #555; }}
+    body.light-theme { background: #f5f5f5; color: #1a1a1a; }
+    body.light-theme .card { background: #fff; border-color: #ddd; box-shadow: 0 2px 8px rgba(0,0,0,0.08); }
+    body.light-theme h1, body.light-theme h2 { color: #111; }
+    body.light-theme .meta, body.light-theme .small, body.light-theme .kpi .label { color: #555; }
+    body.light-theme .kpi { background: #f9f9f9; border-color: #ddd; }
+    body.light-theme .kpi .value { color: #111; }
+    body.light-theme table { color: #1a1a1a; }
+    body.light-theme th { color: #333; }
+    body.light-theme .pie { color: #333; }
+    body.light-theme .pie path, body.light-theme .pie circle { stroke: #fff; }
+    body.light-theme .theme-toggle button { background: #e5e5e5; color: #1a1a1a; border-color: #ccc; }
+    body.light-theme .theme-toggle button:hover { background: #d5d5d5; }
+    body.light-theme .screenshot-row { background: #f5f5f5; }
+    body.light-theme .screenshot-row .screenshot-label { color: #555; }
 
     /* Print: always light background and dark text for visibility */
-    @media print {{
-      body, body.light-theme {{ background: #fff !important; color: #111 !important;
-        -webkit-print-color-adjust: exact; print-color-adjust: exact; }}
-      .card, .card * {{ color: #111 !important; background: transparent !important; }}
-      .card {{ background: #fff !important; border: 1px solid #333 !important;
-        box-shadow: none !important; }}
-      h1, h2 {{ color: #111 !important; }}
-      .meta, .small, .kpi .label, .screenshot-label {{ color: #333 !important; }}
-      .kpi {{ background: #f5f5f5 !important; border: 1px solid #ccc !important; color: #111 !important; }}
-      .kpi .value {{ color: #111 !important; }}
-      table, th, td {{ color: #111 !important; border-color: #333 !important; }}
-      td {{ border-bottom-color: #ddd !important; }}
-      .theme-toggle {{ display: none !important; }}
-      body > p, .footer-note {{ color: #333 !important; }}
-      .source-line {{ color: #111 !important; }}
-      .screenshot-row {{ background: #f5f5f5 !important; }}
-      .screenshot-row .screenshot-label {{ color: #111 !important; }}
-      img {{ border-color: #999 !important; }}
-    }}
+    @media print {
+      body, body.light-theme { background: #fff !important; color: #111 !important;
+        -webkit-print-color-adjust: exact; print-color-adjust: exact; }
+      .card, .card * { color: #111 !important; background: transparent !important; }
+      .card { background: #fff !important; border: 1px solid #333 !important;
+        box-shadow: none !important; }
+      h1, h2 { color: #111 !important; }
+      .meta, .small, .kpi .label, .screenshot-label { color: #333 !important; }
+      .kpi { background: #f5f5f5 !important; border: 1px solid #ccc !important; color: #111 !important; }
+      .kpi .value { color: #111 !important; }
+      table, th, td { color: #111 !important; border-color: #333 !important; }
+      td { border-bottom-color: #ddd !important; }
+      .theme-toggle { display: none !important; }
+      body > p, .footer-note { color: #333 !important; }
+      .source-line { color: #111 !important; }
+      .screenshot-row { background: #f5f5f5 !important; }
+      .screenshot-row .screenshot-label { color: #111 !important; }
+      img { border-color: #999 !important; }
+      .pie path, .pie circle { stroke: #fff !important; }
+    }
   </style>
 </head>
-<body>
-  <div class="theme-toggle">
-    <button type="button" onclick="document.body.classList.toggle('light-theme'); this.textContent = document.body.classList.contains('light-theme') ? 'Dark' : 'Light'; if (window.updateChartTheme) window.updateChartTheme();" aria-label="Toggle light/dark theme">Light</button>
-  </div>
+<body>"""))
+_SUMMARY_CARD_TPL = _compact_html("""
   <div class="card">
     <h1>{title}</h1>
     <div class="meta">This report is intended to be a quick overview of the test results. For detailed test results, please view the original xcresult bundle.</div>
@@ -661,125 +1423,359 @@ def build_html(
       <div class="kpi"><div class="label">Failed</div><div class="value">{failed}</div></div>
       <div class="kpi"><div class="label">Skipped</div><div class="value">{skipped}</div></div>
     </div>
-    <canvas id="pie" width="520" height="320"></canvas>
+    {pie}
     <div class="small source-line">Source: {source_name}</div>
-  </div>"""  # Header and summary card
-
-    # Append optional details section.
-    if details:
-        has_screenshots = bool(screenshot_dir_relative and screenshot_map)
-        has_failures = any(item.get("failure") for item in details)
-        meta_note = "Screenshots included below when available." if has_screenshots else "Best-effort list of tests discovered in the xcresult summary. Screenshots and other rich attachments are not included."
-        html += f"""
+  </div>""")
+_HTML_FOOTER = _compact_html("""
+  <hr style="border: none; border-top: 1px solid #404040; margin: 24px 0 0 0;" />
+  <br /><br /><br />
+  <p class="footer-note" style="color: #6b7280; font-size: 12px; margin: 0;">This was built with passion</p>
+</body>
+</html>
+""")
+
+# Detail-table fragments, filled once per test row with str.format.
+_TD_STYLE = "border-bottom:1px solid #404040; padding:4px 6px;"
+_TH_STYLE = "text-align:left; border-bottom:1px solid #404040; padding:6px;"
+_STATUS_COLOR = {"Failed": "#ef4444", "Passed": "#22c55e", "Skipped": "#f59e0b"}
+_META_WITH_SHOTS = "Screenshots included below when available."
+_META_NO_SHOTS = "Best-effort list of tests discovered in the xcresult summary. Screenshots and other rich attachments are not included."
+_DETAILS_HEAD_TPL = _compact_html(f"""
   <div class="card" style="margin-top:24px;">
     <h2>Test details</h2>
-    <p class="meta">{meta_note}</p>
+    <p class="meta">{{meta_note}}</p>
     <table style="width:100%; border-collapse:collapse; font-size:13px;">
       <thead>
         <tr>
-          <th style="text-align:left; border-bottom:1px solid #404040; padding:6px;">Test</th>
-          <th style="text-align:left; border-bottom:1px solid #404040; padding:6px;">Suite</th>
-          <th style="text-align:left; border-bottom:1px solid #404040; padding:6px;">Status</th>"""
-        if has_failures:
-            html += """
-          <th style="text-align:left; border-bottom:1px solid #404040; padding:6px;">Failure</th>"""
-        html += """
+          <th style="{_TH_STYLE}">Test</th>
+          <th style="{_TH_STYLE}">Suite</th>
+          <th style="{_TH_STYLE}">Status</th>{{failure_th}}
         </tr>
       </thead>
-      <tbody>
-"""
-        for item in details:
-            name = item.get("name", "")
-            suite = item.get("suite", "")
-            status = item.get("status", "")
-            failure = item.get("failure", "")
-            test_id = item.get("testIdentifierString", "")
-            status_color = "#ef4444" if status == "Failed" else "#22c55e" if status == "Passed" else "#f59e0b"
-            html += f"""        <tr>
-          <td style="border-bottom:1px solid #404040; padding:4px 6px;">{name}</td>
-          <td style="border-bottom:1px solid #404040; padding:4px 6px;">{suite}</td>
-          <td style="border-bottom:1px solid #404040; padding:4px 6px; color:{status_color}; font-weight:bold;">{status}</td>"""
-            if has_failures:
-                html += f"""
-          <td style="border-bottom:1px solid #404040; padding:4px 6px; font-size:12px; color:#9ca3af;">{failure}</td>"""
-            html += """
+      <tbody id="detail-rows">
+""")
+_FAILURE_TH = _compact_html(f"""
+          <th style="{_TH_STYLE}">Failure</th>""")
+_DETAILS_TAIL = _compact_html("""      </tbody>
+    </table>
+  </div>
+""")
+_DETAIL_ROW_TPL = _compact_html(f"""        <tr>
+          <td style="{_TD_STYLE}">{{name}}</td>
+          <td style="{_TD_STYLE}">{{suite}}</td>
+          <td style="{_TD_STYLE} color:{{status_color}}; font-weight:bold;">{{status}}</td>{{failure_cell}}
         </tr>
+""")
+_FAILURE_CELL_TPL = _compact_html(f"""
+          <td style="{_TD_STYLE} font-size:12px; color:#9ca3af;">{{failure}}</td>""")
+_IMG_TPL_EAGER = '<img decoding="async" src="{src}" alt="{fn}" style="max-width:280px; max-height:200px; border:1px solid #404040; border-radius:4px;" />'
+_IMG_TPL = _IMG_TPL_EAGER.replace("<img ", '<img loading="lazy" ', 1)
+# The first thumbnails in a report load immediately; the rest wait until scrolled near.
+_EAGER_IMAGES = 2
+_MORE_IMAGES_TPL = '<span style="font-size:12px; color:#9ca3af;">+{count} more</span>'
+# Screenshot thumbnails shown per test; the rest are summarised by _MORE_IMAGES_TPL.
+_MAX_IMAGES_PER_TEST = 10
+# Detail rows the browser renders per scroll step.
+_DETAIL_ROWS_PER_BATCH = 50
+# Client-side rendering of the detail rows from the sibling <stem>_data.js
+# written by _write_details_script(). A <script src> is used rather than
+# fetch() because browsers block fetch() for reports opened from file://.
+_DETAILS_END_HTML = _compact_html("""  <div id="detail-rows-end"></div>
+  <noscript><p class="meta">Enable JavaScript to see the test list.</p></noscript>
+""")
+_DETAILS_SCRIPT_TPL = _DETAILS_END_HTML + """  <script src="{src}"></script>
 """
-            # Optional screenshot row: match by testIdentifierString or testIdentifierURL
-            if has_screenshots and screenshot_map:
-                imgs = screenshot_map.get(test_id)
-                if not imgs:
-                    for key in screenshot_map:
-                        if test_id in key or key.endswith(test_id) or (test_id and key.split("/")[-1] == test_id.split("/")[-1]):
-                            imgs = screenshot_map[key]
-                            break
-                if imgs:
-                    colspan = 4 if has_failures else 3
-                    html += f"""        <tr class="screenshot-row">
+_DETAILS_INLINE_TPL = _DETAILS_END_HTML + """  <script>{script}</script>
+"""
+_DETAILS_RENDER_JS = """  <script>
+  (function () {
+    var data = window.XCR_DETAILS, tbody = document.getElementById("detail-rows");
+    if (!data || !tbody) return;
+    var colors = %(colors)s, tdStyle = %(td_style)s, eagerLeft = %(eager)d;
+    function cell(tr, text, style) {
+      var td = document.createElement("td");
+      td.style.cssText = style || tdStyle;
+      td.textContent = text;
+      tr.appendChild(td);
+      return td;
+    }
+    function screenshotRow(r) {
+      var tr = document.createElement("tr");
+      tr.className = "screenshot-row";
+      var td = cell(tr, "", "border-bottom:1px solid #404040; padding:8px 6px;");
+      td.colSpan = data.failures ? 4 : 3;
+      td.innerHTML = '<div class="screenshot-label" style="font-size:11px; margin-bottom:4px;">Screenshots</div>' +
+        '<div style="display:flex; flex-wrap:wrap; gap:8px;"></div>';
+      var box = td.lastChild;
+      r[4].forEach(function (fn) {
+        var img = document.createElement("img");
+        if (eagerLeft-- <= 0) img.setAttribute("loading", "lazy");
+        img.setAttribute("decoding", "async");
+        img.src = (data.srcs && data.srcs[fn]) || encodeURIComponent(data.shotDir) + "/" + encodeURIComponent(fn);
+        img.alt = fn;
+        img.style.cssText = "max-width:280px; max-height:200px; border:1px solid #404040; border-radius:4px;";
+        box.appendChild(img);
+      });
+      if (r[5]) {
+        var more = document.createElement("span");
+        more.style.cssText = "font-size:12px; color:#9ca3af;";
+        more.textContent = "+" + r[5] + " more";
+        box.appendChild(more);
+      }
+      return tr;
+    }
+    // Rows are appended in batches as the end of the table scrolls into view.
+    var next = 0, observer = null;
+    function renderMore(count) {
+      var frag = document.createDocumentFragment(), end = Math.min(data.rows.length, next + count);
+      for (; next < end; next++) {
+        var r = data.rows[next], tr = document.createElement("tr");
+        cell(tr, r[0]);
+        cell(tr, r[1]);
+        cell(tr, r[2], tdStyle + " color:" + (colors[r[2]] || "#f59e0b") + "; font-weight:bold;");
+        if (data.failures) cell(tr, r[3], tdStyle + " font-size:12px; color:#9ca3af;");
+        frag.appendChild(tr);
+        if (r[4]) frag.appendChild(screenshotRow(r));
+      }
+      tbody.appendChild(frag);
+      return next < data.rows.length;
+    }
+    function renderAll() {
+      renderMore(data.rows.length);
+      if (observer) observer.disconnect();
+    }
+    var sentinel = document.getElementById("detail-rows-end");
+    if (!sentinel || !("IntersectionObserver" in window)) {
+      renderAll();
+      return;
+    }
+    window.addEventListener("beforeprint", renderAll);
+    renderMore(%(batch)d);
+    observer = new IntersectionObserver(function (entries) {
+      if (!entries.some(function (e) { return e.isIntersecting; })) return;
+      if (!renderMore(%(batch)d)) {
+        observer.disconnect();
+        return;
+      }
+      // Re-observe so a sentinel that is still visible triggers the next batch.
+      observer.unobserve(sentinel);
+      observer.observe(sentinel);
+    }, {rootMargin: "800px 0px"});
+    observer.observe(sentinel);
+  })();
+  </script>
+""" % {"colors": json.dumps(_STATUS_COLOR), "td_style": json.dumps(_TD_STYLE), "batch": _DETAIL_ROWS_PER_BATCH, "eager": _EAGER_IMAGES}
+_SCREENSHOT_ROW_TPL = _compact_html("""        <tr class="screenshot-row">
           <td colspan="{colspan}" style="border-bottom:1px solid #404040; padding:8px 6px;">
             <div class="screenshot-label" style="font-size:11px; margin-bottom:4px;">Screenshots</div>
-            <div style="display:flex; flex-wrap:wrap; gap:8px;">"""
-                    for fn in imgs[:10]:
-                        src = f"{screenshot_dir_relative}/{fn}"
-                        html += f'<img src="{src}" alt="{fn}" style="max-width:280px; max-height:200px; border:1px solid #404040; border-radius:4px;" />'
-                    if len(imgs) > 10:
-                        html += f'<span style="font-size:12px; color:#9ca3af;">+{len(imgs)-10} more</span>'
-                    html += """</div>
+            <div style="display:flex; flex-wrap:wrap; gap:8px;">{images}</div>
           </td>
         </tr>
-"""
-        html += """      </tbody>
-    </table>
-  </div>
-"""
+""")
 
-    # Close the document (Chart.js script: must interpolate passed/failed/skipped).
-    # Chart is stored so beforeprint can redraw legend with dark text for printing.
-    html += f"""
-  <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-  <script>
-    Chart.defaults.color = '#d1d5db';
-    Chart.defaults.borderColor = '#404040';
-    const ctx = document.getElementById('pie');
-    const pieChart = new Chart(ctx, {{
-      type: 'pie',
-      data: {{
-        labels: ['Passed', 'Failed', 'Skipped'],
-        datasets: [{{ data: [{passed}, {failed}, {skipped}],
-          backgroundColor: ['#22c55e', '#ef4444', '#f59e0b'],
-          borderColor: '#2b2b2b',
-          borderWidth: 2 }}]
-      }},
-      options: {{
-        responsive: true,
-        plugins: {{ legend: {{ position: 'bottom', labels: {{ color: '#d1d5db' }} }}, title: {{ display: false }} }}
-      }}
-    }});
-    function getLegendColor() {{
-      return document.body.classList.contains('light-theme') ? '#333' : '#d1d5db';
-    }}
-    window.addEventListener('beforeprint', function() {{
-      pieChart.options.plugins.legend.labels.color = '#111';
-      pieChart.update();
-    }});
-    window.addEventListener('afterprint', function() {{
-      pieChart.options.plugins.legend.labels.color = getLegendColor();
-      pieChart.update();
-    }});
-    window.updateChartTheme = function() {{
-      if (typeof pieChart !== 'undefined' && pieChart.options.plugins.legend.labels) {{
-        pieChart.options.plugins.legend.labels.color = getLegendColor();
-        pieChart.update();
-      }}
-    }};
-  </script>
-  <hr style="border: none; border-top: 1px solid #404040; margin: 24px 0 0 0;" />
-  <br /><br /><br />
-  <p class="footer-note" style="color: #6b7280; font-size: 12px; margin: 0;">This was built with passion</p>
-</body>
-</html>
-"""
-    return html
+
+def _detail_screenshots(details: list, screenshot_map: Optional[Dict[str, List[str]]]) -> List[Optional[List[str]]]:
+    """Screenshot file names for each detail row, matched by testIdentifierString or its last path component."""
+    if not screenshot_map:
+        return [None] * len(details)
+    # Index attachments by the last path component of their test identifier once,
+    # so each row does O(1) lookups instead of scanning every key.
+    shots_by_basename: Dict[str, List[str]] = {}
+    for key, files in screenshot_map.items():
+        shots_by_basename.setdefault(key.rsplit("/", 1)[-1], files)
+    shots = []
+    for item in details:
+        test_id = item.get("testIdentifierString", "")
+        shots.append((screenshot_map.get(test_id) or shots_by_basename.get(test_id.rsplit("/", 1)[-1])) if test_id else None)
+    return shots
+
+
+def _image_data_uris(screenshot_abs: Path, details: list, screenshot_map: Dict[str, List[str]]) -> Dict[str, str]:
+    """data: URIs for the screenshots the detail rows show, keyed by exported file name.
+
+    The manifest also lists attachments of tests without a detail row; those are not encoded.
+    """
+    uris: Dict[str, str] = {}
+    for files in _detail_screenshots(details, screenshot_map):
+        for fn in (files or ())[:_MAX_IMAGES_PER_TEST]:
+            if fn in uris:
+                continue
+            try:
+                data = (screenshot_abs / fn).read_bytes()
+            except OSError:
+                continue
+            mime = mimetypes.guess_type(fn)[0] or "application/octet-stream"
+            uris[fn] = f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+    return uris
+
+
+def _write_details_script(
+    path: str,
+    details: list,
+    screenshot_dir_relative: Optional[str] = None,
+    screenshot_map: Optional[Dict[str, List[str]]] = None,
+) -> None:
+    """Write _details_script() output to path (the sibling <stem>_data.js)."""
+    with open(path, "wb") as f:
+        f.write(_details_script(details, screenshot_dir_relative, screenshot_map))
+
+
+def _details_script(
+    details: list,
+    screenshot_dir_relative: Optional[str] = None,
+    screenshot_map: Optional[Dict[str, List[str]]] = None,
+    image_srcs: Optional[Dict[str, str]] = None,
+    inline: bool = False,
+) -> bytes:
+    """The detail rows as a script defining window.XCR_DETAILS, for _DETAILS_RENDER_JS.
+
+    Rows are compact arrays: [name, suite, status, failure] plus
+    [first screenshots, number not shown] when the test has screenshots.
+    image_srcs (file name -> URL) overrides shotDir/name for embedded images.
+    inline=True escapes '<' so the script can sit inside a <script> element.
+    """
+    has_screenshots = bool(screenshot_dir_relative and screenshot_map)
+    rows = []
+    for item, imgs in zip(details, _detail_screenshots(details, screenshot_map if has_screenshots else None)):
+        row = [item.get("name", ""), item.get("suite", ""), item.get("status", ""), item.get("failure", "")]
+        if imgs:
+            row += [imgs[:_MAX_IMAGES_PER_TEST], max(0, len(imgs) - _MAX_IMAGES_PER_TEST)]
+        rows.append(row)
+    payload = {
+        "failures": any(item.get("failure") for item in details),
+        "shotDir": screenshot_dir_relative if has_screenshots else None,
+        "rows": rows,
+    }
+    if image_srcs:
+        payload["srcs"] = image_srcs
+    body = _json_dumps(payload)
+    if inline:
+        # '<' only occurs inside JSON strings, where \u003c is equivalent.
+        body = body.replace(b"<", b"\\u003c")
+    return b"window.XCR_DETAILS = " + body + b";\n"
+
+
+def build_html(
+    passed: int,
+    failed: int,
+    skipped: int,
+    source_name: str,
+    title: str,
+    details: Optional[list] = None,
+    screenshot_dir_relative: Optional[str] = None,
+    screenshot_map: Optional[Dict[str, List[str]]] = None,
+    for_pdf: bool = False,
+    details_script: Optional[str] = None,
+    details_inline: Optional[str] = None,
+    image_srcs: Optional[Dict[str, str]] = None,
+) -> str:
+    """Return the report from _html_parts() as a single string."""
+    return "".join(_html_parts(
+        passed, failed, skipped, source_name, title, details,
+        screenshot_dir_relative=screenshot_dir_relative,
+        screenshot_map=screenshot_map,
+        for_pdf=for_pdf,
+        details_script=details_script,
+        details_inline=details_inline,
+        image_srcs=image_srcs,
+    ))
+
+
+def _html_parts(
+    passed: int,
+    failed: int,
+    skipped: int,
+    source_name: str,
+    title: str,
+    details: Optional[list] = None,
+    screenshot_dir_relative: Optional[str] = None,
+    screenshot_map: Optional[Dict[str, List[str]]] = None,
+    for_pdf: bool = False,
+    details_script: Optional[str] = None,
+    details_inline: Optional[str] = None,
+    image_srcs: Optional[Dict[str, str]] = None,
+) -> List[str]:
+    """Construct an HTML report containing test counts, a pie chart, optional details, and optional screenshots.
+
+    The report is returned as an ordered list of fragments so callers can
+    stream it to disk without joining it into one string first.
+
+    The pie chart is a static inline SVG computed here, so it needs no
+    JavaScript or network access and also renders in PDFs.  The layout uses
+    simple CSS for readability.  The source filename is displayed at the
+    bottom.  for_pdf=True leaves out interactive-only parts (the theme toggle).
+    screenshot_map: testIdentifier or testIdentifierURL -> list of exported filenames (in screenshot_dir_relative).
+    details_script: relative URL of a _write_details_script() file; when set
+    (and not for_pdf) the detail rows are rendered by the browser from it
+    instead of being written into the page. details_inline is the same
+    script text (from _details_script(inline=True)) placed in the page itself.
+    image_srcs: exported file name -> URL (e.g. data: URI) used instead of
+    screenshot_dir_relative/name.
+    """
+    total = passed + failed + skipped
+    title = _esc(title)
+    source_name = _esc(source_name)
+    # The theme toggle is interactive only, so the PDF variant leaves it out.
+    toggle_html = "" if for_pdf else _THEME_TOGGLE_HTML
+    parts: List[str] = [_HTML_HEAD_OPEN, title, _HTML_STYLE_AND_BODY_OPEN, toggle_html]
+    parts.append(_SUMMARY_CARD_TPL.format(
+        title=title,
+        total=total,
+        passed=passed,
+        failed=failed,
+        skipped=skipped,
+        pie=_svg_pie(passed, failed, skipped),
+        source_name=source_name,
+    ))  # Header and summary card
+
+    # Append optional details section.
+    if details:
+        has_screenshots = bool(screenshot_dir_relative and screenshot_map)
+        has_failures = any(item.get("failure") for item in details)
+        parts.append(_DETAILS_HEAD_TPL.format(
+            meta_note=_META_WITH_SHOTS if has_screenshots else _META_NO_SHOTS,
+            failure_th=_FAILURE_TH if has_failures else "",
+        ))
+        if (details_script or details_inline) and not for_pdf:
+            parts.append(_DETAILS_TAIL)
+            if details_inline:
+                parts.append(_DETAILS_INLINE_TPL.format(script=details_inline))
+            else:
+                parts.append(_DETAILS_SCRIPT_TPL.format(src=_esc(urllib.parse.quote(details_script))))
+            parts.append(_DETAILS_RENDER_JS)
+            parts.append(_HTML_FOOTER)
+            return parts
+        colspan = 4 if has_failures else 3
+        eager_left = _EAGER_IMAGES
+        shot_dir = _esc(urllib.parse.quote(screenshot_dir_relative or ""))
+        row_fmt = _DETAIL_ROW_TPL.format
+        failure_fmt = _FAILURE_CELL_TPL.format
+        row_shots = _detail_screenshots(details, screenshot_map if has_screenshots else None)
+        for item, imgs in zip(details, row_shots):
+            status = item.get("status", "")
+            parts.append(row_fmt(
+                name=_esc(item.get("name", "")),
+                suite=_esc(item.get("suite", "")),
+                status=_esc(status),
+                status_color=_STATUS_COLOR.get(status, "#f59e0b"),
+                failure_cell=failure_fmt(failure=_esc(item.get("failure", ""))) if has_failures else "",
+            ))
+            # Optional screenshot row: match by testIdentifierString or testIdentifierURL
+            if imgs:
+                tags = []
+                for fn in imgs[:_MAX_IMAGES_PER_TEST]:
+                    src = image_srcs.get(fn) if image_srcs else None
+                    tpl = _IMG_TPL_EAGER if eager_left > 0 else _IMG_TPL
+                    eager_left -= 1
+                    tags.append(tpl.format(src=src or f"{shot_dir}/{_esc(urllib.parse.quote(fn))}", fn=_esc(fn)))
+                if len(imgs) > _MAX_IMAGES_PER_TEST:
+                    tags.append(_MORE_IMAGES_TPL.format(count=len(imgs) - _MAX_IMAGES_PER_TEST))
+                parts.append(_SCREENSHOT_ROW_TPL.format(colspan=colspan, images="".join(tags)))
+        parts.append(_DETAILS_TAIL)
+
+    # Close the document.
+    parts.append(_HTML_FOOTER)
+    return parts
 
 
 class XCResultGUI:
@@ -818,7 +1814,7 @@ class XCResultGUI:
         self.report_title = tk.StringVar(value="XCTest Summary")
         self.include_details = tk.BooleanVar(value=False)
         # self.include_screenshots = tk.BooleanVar(value=False)  # Screenshot UI commented out
-        _log(self.log_path.get(), f"[startup] dnd_available={_DND_AVAILABLE} weasy_available={_WEASY_AVAILABLE}")
+        _log(self.log_path.get(), f"[startup] dnd_available={_DND_AVAILABLE} weasy_available={_WEASY_AVAILABLE} orjson_available={_ORJSON_AVAILABLE}")
         _log(self.log_path.get(), f"[startup] python={sys.executable} cwd={os.getcwd()}")
         # Build UI
         self._build_widgets()
@@ -898,6 +1894,14 @@ class XCResultGUI:
 
         # Progress bar (spinner) shown while processing
         self.progress = ttk.Progressbar(frm, mode="indeterminate")
+        # Report generation runs here so the Tk main loop (and the spinner) keeps running.
+        self._worker = ThreadPoolExecutor(max_workers=1)
+        self._generate_future: Optional[Future] = None
+        self._generate_run: Optional[_CancellableRun] = None
+        # Closing the window must not leave the process waiting on xcresulttool.
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        # Status lines from the worker; only the Tk thread touches status_var.
+        self._status_queue: "queue.Queue[str]" = queue.Queue()
 
     def _start_spinner(self):
         """Show and start the indeterminate progress bar."""
@@ -905,7 +1909,6 @@ class XCResultGUI:
             if not self.progress.winfo_ismapped():
                 self.progress.pack(fill=tk.X, padx=5, pady=(4, 0))
             self.progress.start(80)
-            self.root.update_idletasks()
         except Exception:
             pass
 
@@ -915,7 +1918,6 @@ class XCResultGUI:
             self.progress.stop()
             if self.progress.winfo_ismapped():
                 self.progress.pack_forget()
-            self.root.update_idletasks()
         except Exception:
             pass
 
@@ -985,43 +1987,52 @@ class XCResultGUI:
         if not out_path:
             messagebox.showerror("Missing output", "Please choose where to save the HTML file.")
             return
+        if self._generate_future is not None and not self._generate_future.done():
+            return  # Already generating
         out_path = _next_available_report_path(out_path)
         if out_path != self.output_path.get():
             self.output_path.set(out_path)
-        # Random minimum spinner duration between 2 and 5 seconds
-        min_spinner_seconds = random.uniform(2.0, 5.0)
-        start_time = time.time()
         # Run xcresulttool and parse counts
         self.status_var.set("Extracting summary…")
-        self.root.update_idletasks()
         self._start_spinner()
         _log(self.log_path.get(), f"[generate] xcresult={xc_path}")
+        # Tk variables are read here; the worker thread only gets plain values.
+        self._generate_run = _CancellableRun()
+        self._generate_future = self._worker.submit(
+            _process_xcresult_to_html,
+            xcresult_path=xc_path,
+            out_html_path=out_path,
+            log_path=self.log_path.get(),
+            report_title=(self.report_title.get().strip() or None),
+            include_details=bool(self.include_details.get()),
+            include_screenshots=False,  # Screenshot UI commented out
+            progress=self._status_queue.put,
+            run=self._generate_run,
+        )
+        self.root.after(100, self._poll_generate, self._generate_future, out_path)
+
+    def _poll_generate(self, future: Future, out_path: str):
+        """Check the background generation from the Tk main loop and finish when done."""
         try:
-            passed, failed, skipped = _process_xcresult_to_html(
-                xcresult_path=xc_path,
-                out_html_path=out_path,
-                log_path=self.log_path.get(),
-                report_title=(self.report_title.get().strip() or None),
-                include_details=bool(self.include_details.get()),
-                include_screenshots=False,  # Screenshot UI commented out
-            )
+            while True:
+                self.status_var.set(self._status_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if not future.done():
+            self.root.after(100, self._poll_generate, future, out_path)
+            return
+        try:
+            future.result()
         except Exception as exc:
             messagebox.showerror("Error", str(exc))
             self.status_var.set("Error generating HTML")
             self._stop_spinner()
             return
-
-        # Ensure spinner stays visible for at least the random minimum duration
-        elapsed = time.time() - start_time
-        remaining_ms = max(0, int((min_spinner_seconds - elapsed) * 1000))
-        if remaining_ms > 0:
-            self.root.after(remaining_ms, lambda: self._finish_success(out_path))
-        else:
-            self._finish_success(out_path)
+        self._finish_success(out_path)
 
     def _export_pdf(self):
         try:
-            from weasyprint import HTML as WeasyHTML  # type: ignore
+            WeasyHTML, font_config = _weasy()
         except Exception as exc:
             messagebox.showerror(
                 "Unavailable",
@@ -1049,14 +2060,15 @@ class XCResultGUI:
             _log(self.log_path.get(), "[pdf] Loading HTML file with WeasyPrint")
             html_doc = WeasyHTML(filename=out_html)
             _log(self.log_path.get(), f"[pdf] HTML document loaded, writing PDF to {pdf_path}")
-            html_doc.write_pdf(pdf_path)
+            html_doc.write_pdf(pdf_path, font_config=font_config)
             _log(self.log_path.get(), f"[pdf] PDF successfully written to {pdf_path}")
-            # Verify PDF was created
-            if Path(pdf_path).exists():
-                pdf_size = Path(pdf_path).stat().st_size
-                _log(self.log_path.get(), f"[pdf] PDF file exists, size: {pdf_size} bytes")
-            else:
+            # Verify PDF was created (one stat call for existence and size)
+            try:
+                pdf_size = os.stat(pdf_path).st_size
+            except OSError:
                 _log(self.log_path.get(), "[pdf] WARNING: PDF file was not created")
+            else:
+                _log(self.log_path.get(), f"[pdf] PDF file exists, size: {pdf_size} bytes")
         except Exception as exc:
             _log(self.log_path.get(), f"[pdf] ERROR during PDF conversion: {exc}")
             _log(self.log_path.get(), f"[pdf] Exception type: {type(exc).__name__}")
@@ -1068,6 +2080,13 @@ class XCResultGUI:
         self.status_var.set(f"PDF exported at {pdf_path}")
         messagebox.showinfo("Success", f"PDF generated:\n{pdf_path}")
 
+    def _on_close(self):
+        """Kill an in-flight generation, then close; the worker thread is joined at exit."""
+        if self._generate_run is not None:
+            self._generate_run.cancel()
+        self._worker.shutdown(wait=False)
+        self.root.destroy()
+
     def run(self):
         self.root.mainloop()
 
@@ -1084,12 +2103,22 @@ def main(argv=None):
     )
     parser.add_argument(
         "xcresult",
-        nargs="?",
-        help="Path to the .xcresult bundle (required in CLI mode).",
+        nargs="*",
+        help="Path to the .xcresult bundle (required in CLI mode). Several bundles can be given with --output-dir.",
     )
     parser.add_argument(
         "--output-html",
-        help="Path where the HTML report should be written (required in CLI mode).",
+        help="Path where the HTML report should be written (required in CLI mode for a single bundle).",
+    )
+    parser.add_argument(
+        "--output-dir",
+        help="Directory for the reports when converting several bundles (CLI mode). Each report is named after its bundle.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=max(1, (os.cpu_count() or 2) // 2),
+        help="Number of bundles converted in parallel with --output-dir.",
     )
     parser.add_argument(
         "--log-path",
@@ -1113,28 +2142,75 @@ def main(argv=None):
         action="store_true",
         help="Include exported screenshots in the report (only with --include-details).",
     )
+    parser.add_argument(
+        "--embed-images",
+        action="store_true",
+        help="Embed screenshots as data URIs and inline the test list, producing one self-contained HTML file "
+             "(requires --include-details and --include-screenshots). By default screenshots are linked from a sibling folder.",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Also write gzip-compressed copies (.gz) of the report and its data script, for static HTTP servers "
+             "that serve pre-compressed files.",
+    )
+    parser.add_argument(
+        "--debug-json",
+        action="store_true",
+        help="Keep the raw xcresulttool JSON next to the HTML report (same basename, .json).",
+    )
 
     args = parser.parse_args(argv)
 
+    if args.embed_images and not (args.include_details and args.include_screenshots):
+        parser.error("--embed-images requires --include-details and --include-screenshots.")
+
     if args.cli:
-        if not args.xcresult or not args.output_html:
-            parser.error("--cli requires an .xcresult path and --output-html.")
+        if args.output_dir:
+            if not args.xcresult:
+                parser.error("--cli requires at least one .xcresult path.")
+            if args.output_html or args.pdf_output:
+                parser.error("--output-html and --pdf-output cannot be combined with --output-dir.")
+            exit_code = run_cli_batch(
+                xcresult_paths=args.xcresult,
+                out_dir=args.output_dir,
+                jobs=args.jobs,
+                log_path=args.log_path,
+                report_title=args.title,
+                include_details=bool(args.include_details),
+                include_screenshots=bool(args.include_screenshots) if args.include_details else False,
+                debug_json=bool(args.debug_json),
+                embed_images=bool(args.embed_images),
+                write_gzip=bool(args.gzip),
+            )
+            raise SystemExit(exit_code)
+
+        if len(args.xcresult) != 1 or not args.output_html:
+            parser.error("--cli requires one .xcresult path and --output-html (or several paths with --output-dir).")
 
         exit_code = run_cli(
-            xcresult_path=args.xcresult,
+            xcresult_path=args.xcresult[0],
             out_html_path=args.output_html,
             log_path=args.log_path,
             pdf_output_path=args.pdf_output,
             report_title=args.title,
             include_details=bool(args.include_details),
             include_screenshots=bool(args.include_screenshots) if args.include_details else False,
+            debug_json=bool(args.debug_json),
+            embed_images=bool(args.embed_images),
+            write_gzip=bool(args.gzip),
         )
         raise SystemExit(exit_code)
 
     # Default: launch the GUI.
+    if sys.platform != "darwin" and not os.environ.get("DISPLAY"):
+        parser.error("no display available for the GUI; use --cli with an .xcresult path and --output-html.")
+    _import_gui()
     app = XCResultGUI()
     app.run()
 
 
 if __name__ == '__main__':
+    # Needed for the ProcessPoolExecutor workers in the frozen .app.
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file